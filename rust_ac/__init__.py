@@ -1,6 +1,6 @@
 from .rust_ac import PServer
-from .server import Server
-from .supervisor import Supervisor
+from .server import Server, ServerPool
+from .supervisor import Supervisor, close_session
 from .game_config import GameConfig
 from .result import Result
 from .bot import Bot
@@ -3,11 +3,23 @@ from typing import Optional
 from os import path
 import os
 import platform
+import signal
 import sys
 import re
 from subprocess import Popen, STDOUT, call
 import subprocess
 
+_WSL_DRIVE_RE = re.compile(r'([A-Za-z])(:)')
+
+# Bot file name (formatted with the bot name) for each bot type, in the order they are probed
+_BOT_TYPE_FILES = (
+    ('run.py', 'Python'),
+    ('{name}.exe', 'cppwin32'),
+    ('{name}', 'cpplinux'),
+    ('{name}.dll', 'dotnetcore'),
+    ('{name}.jar', 'java'),
+)
+
 
 class BotTypeError(Exception):
     pass
@@ -22,7 +34,20 @@ class BotStartError(Exception):
 
 
 def convert_to_wsl(_path: Path) -> str:
-    return re.sub(r'([A-Za-z])(:)', lambda x: '/mnt/' + x.group(1).lower(), _path.as_posix()).replace(' ', r'\ ')
+    return _WSL_DRIVE_RE.sub(lambda x: '/mnt/' + x.group(1).lower(), _path.as_posix()).replace(' ', r'\ ')
+
+
+def kill_bot_process(pid: int):
+    """
+    Kills a bot process. On Linux bots lead their own process group, so their children are killed too.
+    """
+    try:
+        if platform.system() == "Linux":
+            os.killpg(pid, signal.SIGKILL)
+        else:
+            os.kill(pid, getattr(signal, "SIGKILL", signal.SIGTERM))
+    except OSError:
+        pass  # Already exited
 
 
 def wsl_installed():
@@ -44,14 +69,7 @@ class Bot:
 
     @property
     def type_mapping(self):
-        bot_name = self.name
-        return {
-            'run.py': 'Python',
-            f'{bot_name}.exe': 'cppwin32',
-            f"{bot_name}": 'cpplinux',
-            f"{bot_name}.dll": "dotnetcore",
-            f"{bot_name}.jar": "java"
-        }
+        return {file_name.format(name=self.name): bot_type for file_name, bot_type in _BOT_TYPE_FILES}
 
     @property
     def type_mapping_swopped(self):
@@ -59,29 +77,22 @@ class Bot:
 
     def deduce_bot_type(self) -> str:
         bot_name = self.name
-        type_mapping = {
-            'run.py': 'Python',
-            f'{bot_name}.exe': 'cppwin32',
-            f"{bot_name}": 'cpplinux',
-            f"{bot_name}.dll": "dotnetcore",
-            f"{bot_name}.jar": "java"
-        }
         bot_folder = self.directory.joinpath(self.name)
         if not bot_folder.exists():
             raise BotFolderError(f"{bot_folder} does not exist. Please check the path.")
-        for file in bot_folder.iterdir():
-            if file.is_file() and file.name in type_mapping:
-                return type_mapping.get(file.name)
-        else:
-            raise BotTypeError(f"Could not automatically deduce bot type for {bot_name}. "
-                               f"Please specify type in the GameConfig folder")
+        for file_name, bot_type in _BOT_TYPE_FILES:
+            if bot_folder.joinpath(file_name.format(name=bot_name)).is_file():
+                return bot_type
+        raise BotTypeError(f"Could not automatically deduce bot type for {bot_name}. "
+                           f"Please specify type in the GameConfig folder")
 
     def kill(self):
-        self.process.kill()
+        kill_bot_process(self.process.pid)
 
     def start(self, opponent_id: str, port: int, host: str = '127.0.0.1'):
         bot_type = self.type
         bot_folder = self.directory.joinpath(self.name)
+        bot_folder_str = bot_folder.as_posix()
         bot_file = self.type_mapping_swopped.get(bot_type)
 
         cmd_line = [
@@ -99,14 +110,14 @@ class Bot:
             cmd_line.insert(0, sys.executable)
         elif bot_type.lower() == "cppwin32" and platform.system() == "Linux":
             cmd_line.pop(0)
-            cmd_line.insert(0, path.join(bot_folder.as_posix(), bot_file))
+            cmd_line.insert(0, path.join(bot_folder_str, bot_file))
             cmd_line.insert(0, "wine")
         elif bot_type.lower() == "dotnetcore":
             cmd_line.insert(0, "dotnet")
         elif (bot_type.lower() == "cpplinux" and platform.system() == "Linux") \
                 or (bot_type.lower() == "cppwin32" and platform.system() == "Windows"):
             cmd_line.pop(0)
-            cmd_line.insert(0, path.join(bot_folder.as_posix(), bot_file))
+            cmd_line.insert(0, path.join(bot_folder_str, bot_file))
         elif bot_type.lower() == "java":
             cmd_line.insert(0, "java")
             cmd_line.insert(1, "-jar")
@@ -122,17 +133,22 @@ class Bot:
 
         try:
             is_linux = platform.system() == "Linux"
-            with open(bot_folder.joinpath("data").joinpath("stderr.log").as_posix(), "w+") as out:
+            # Only the descriptor is handed to the bot, so skip Python's buffered file object
+            out = os.open(path.join(bot_folder_str, "data", "stderr.log"),
+                          os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+            try:
                 process = Popen(
-                    " ".join(cmd_line),
+                    cmd_line,
                     stdout=out,
                     stderr=STDOUT,
-                    cwd=(str(bot_folder.as_posix())),
-                    shell=True if is_linux else False,
+                    cwd=bot_folder_str,
+                    shell=False,
                     preexec_fn=os.setpgrp if is_linux else None,
-                    creationflags=None if is_linux else subprocess.CREATE_NEW_PROCESS_GROUP,
+                    creationflags=0 if is_linux else subprocess.CREATE_NEW_PROCESS_GROUP,
                 )
                 self.process = process
+            finally:
+                os.close(out)  # The bot holds its own copy of the descriptor
 
         except Exception as exception:
             raise BotStartError(exception)
@@ -1,7 +1,17 @@
-from json import dumps
+try:
+    from orjson import dumps as _orjson_dumps
+
+    def dumps(obj) -> str:
+        # The proxy only reads text frames, so the config is sent as str rather than bytes
+        return _orjson_dumps(obj).decode()
+except ImportError:
+    from json import dumps
 
 
 class GameConfig:
+    __slots__ = ('map_name', 'player1', 'player2', 'disable_debug', 'real_time', 'replay_name', 'max_game_time',
+                 'light_mode', 'player1_race', 'player2_race', 'archon', 'validate_race', '_json')
+
     def __init__(self,
                  map_name=None,
                  player1=None,
@@ -32,7 +42,17 @@ class GameConfig:
         else:
             self.validate_race = validate_race
 
+    def __setattr__(self, name, value):
+        object.__setattr__(self, name, value)
+        if name != '_json':
+            object.__setattr__(self, '_json', None)  # Invalidate the cached serialization
+
     def to_json(self):
+        if self._json is None:
+            self._json = self._dumps()
+        return self._json
+
+    def _dumps(self):
         return dumps({
             "Map": self.map_name,
             "MaxGameTime": self.max_game_time,
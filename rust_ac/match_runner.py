@@ -1,9 +1,10 @@
-from . import Result, Server, Supervisor, GameConfig, Bot
+from . import Result, Supervisor, GameConfig, Bot
+from .server import ServerPool
+from .bot import kill_bot_process
 
 from pathlib import Path
-from asyncio import get_event_loop, gather
-from typing import List, Union
-import portpicker
+from asyncio import new_event_loop, gather, Semaphore
+from typing import List
 from os import cpu_count
 from atexit import register
 
@@ -18,56 +19,59 @@ class MatchRunner:
             raise OSError("The directory name is incorrect. Please check the path")
         self.bot_directory = _bot_directory
         self.proxy_host = proxy_host
-        self._processes = set()
+        self._pids: List[int] = []
+        self._pool = ServerPool(max(1, cpu_count() // 2), host=proxy_host)
+        self._loop = new_event_loop()
         register(self._cleanup)
 
-    async def _run_game(self, game: GameConfig, port: int, host: str = '127.0.0.1'):
-        s = Server(f"{host}:{port}")
-        s.run()
-        self._add_to_cleanup(s)
-        sup = Supervisor(f"127.0.0.1:{port}", config=game)
-        bots = [Bot(game.player1, self.bot_directory), Bot(game.player2, self.bot_directory)]
-        await sup.start_game()  # Sends config to proxy
-        for bot in bots:
-            self._add_to_cleanup(bot)
-            bot.start("123", port=port)
-            if await sup.wait_for_bot(timeout=400):
-                continue
-            else:
+    async def _run_game(self, game: GameConfig):
+        s, port = await self._pool.acquire()
+        started: List[Bot] = []
+        try:
+            sup = Supervisor(f"{self.proxy_host}:{port}", config=game)
+            bots = [Bot(game.player1, self.bot_directory), Bot(game.player2, self.bot_directory)]
+            await sup.start_game()  # Sends config to proxy
+            for bot in bots:
+                bot.start("123", port=port, host=self.proxy_host)
+                started.append(bot)
+                self._add_to_cleanup(bot)
+                if await sup.wait_for_bot(timeout=400):
+                    continue
+                else:
+                    return 'error'
+            game_result = await sup.wait_for_result()
+            return game_result
+        finally:
+            for bot in started:
                 bot.kill()
-                return 'error'
-        game_result = await sup.wait_for_result()
-        for bot in bots:
-            bot.kill()
-        s.kill()
-        return game_result
+                self._remove_from_cleanup(bot)
+            await self._pool.release(s)  # Recycles the proxy for the next game
 
-    def run_games_multiple(self, games: List[GameConfig], instances: int = int(cpu_count() / 2)) -> List[Result]:
-        ports = [portpicker.pick_unused_port() for _ in range(len(games))]
-        results = []
-        while len(games) > 0:
-            used_ports = ports[:instances]
-            new_games = [self._run_game(game, port) for game, port in zip(games[:instances], used_ports)]
+    async def _run_game_limited(self, semaphore: Semaphore, game: GameConfig):
+        async with semaphore:
+            return await self._run_game(game)
 
-            del games[:instances]
-            del ports[:instances]
+    async def _run_games(self, games: List[GameConfig], instances: int) -> List[Result]:
+        semaphore = Semaphore(instances)
+        return await gather(*[self._run_game_limited(semaphore, game) for game in games])
 
-            results += get_event_loop().run_until_complete(gather(*new_games))
-            for port in used_ports:
-                portpicker.return_port(port)
-        return results
+    def run_games_multiple(self, games: List[GameConfig], instances: int = int(cpu_count() / 2)) -> List[Result]:
+        return list(self._loop.run_until_complete(self._run_games(games, max(1, instances))))
 
     def run_game(self, game: GameConfig) -> Result:
-        port = portpicker.pick_unused_port()
-        return get_event_loop().run_until_complete(self._run_game(game, port))
+        return self._loop.run_until_complete(self._run_game(game))
+
+    def _add_to_cleanup(self, bot: Bot):
+        self._pids.append(bot.process.pid)
 
-    def _add_to_cleanup(self, process: Union[Server, Bot]):
-        self._processes.add(process)
+    def _remove_from_cleanup(self, bot: Bot):
+        self._pids.remove(bot.process.pid)
 
     def _cleanup(self):
         print("Cleanup called")
-        for process in self._processes:
-            process.kill()
+        for pid in self._pids:
+            kill_bot_process(pid)
+        self._pids.clear()
 
 
 if __name__ == "__main__":
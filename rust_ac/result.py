@@ -3,7 +3,36 @@ import os
 from .game_config import GameConfig
 
 
+_PLAYER_RESULTS = ("Victory", "Defeat", "Tie", "Crash", "Timeout", "InitializationError")
+
+
+def _outcome(p1_result, p2_result):
+    """
+    Returns (result, winner) for the players' results, where the winner is 1, 2, "Tie" or None (unchanged)
+    """
+    if p1_result == "Crash":
+        return "Player1Crash", 2
+    elif p2_result == "Crash":
+        return "Player2Crash", 1
+    elif p1_result == "Timeout":
+        return "Player1TimeOut", 2
+    elif p2_result == "Timeout":
+        return "Player2TimeOut", 1
+    elif p1_result == "Victory":
+        return "Player1Win", 1
+    elif p1_result == "Defeat":
+        return "Player2Win", 2
+    elif p1_result == "Tie" or p2_result == "Tie":
+        return "Tie", "Tie"
+    elif p1_result == "InitializationError" or p2_result == "InitializationError":
+        return "InitializationError", None
+    return None
+
+
 class Result:
+    # (player 1 result, player 2 result) -> outcome, precomputed for every pair of known results
+    _OUTCOME_MAP = {(p1, p2): _outcome(p1, p2) for p1 in _PLAYER_RESULTS for p2 in _PLAYER_RESULTS}
+
     def __init__(self, match_config, cfg=None):
         if isinstance(match_config, GameConfig):
             self.match_id = None
@@ -80,47 +109,24 @@ class Result:
                 self.result = "Error"
                 return
 
-            if temp_results[self.bot1] == "SC2Crash" or temp_results[self.bot2] == "SC2Crash":
+            p1_result, p2_result = temp_results[self.bot1], temp_results[self.bot2]
+            if p1_result == "SC2Crash" or p2_result == "SC2Crash":
                 self.result = "Error"
                 return
 
-            elif temp_results[self.bot1] == "Crash":
-                self.result = "Player1Crash"
-                self.winner = self.bot2
-
-            elif temp_results[self.bot2] == "Crash":
-                self.result = "Player2Crash"
-                self.winner = self.bot1
-
-            elif temp_results[self.bot1] == "Timeout":
-                self.result = "Player1TimeOut"
-                self.winner = self.bot2
-
-            elif temp_results[self.bot2] == "Timeout":
-                self.result = "Player2TimeOut"
-                self.winner = self.bot1
-
-            elif temp_results[self.bot1] == "Victory":
-                self.result = "Player1Win"
-                self.winner = self.bot1
-
-            elif temp_results[self.bot1] == "Defeat":
-                self.result = "Player2Win"
-                self.winner = self.bot2
-
-            elif temp_results[self.bot1] == "Tie":
-                self.result = "Tie"
-                self.winner = "Tie"
-
-            elif temp_results[self.bot2] == "Tie":
-                self.result = "Tie"
-                self.winner = "Tie"
-
-            elif temp_results[self.bot1] == 'InitializationError':
-                self.result = "InitializationError"
-
-            elif temp_results[self.bot2] == 'InitializationError':
-                self.result = "InitializationError"
+            players_results = (p1_result, p2_result)
+            if players_results in self._OUTCOME_MAP:
+                outcome = self._OUTCOME_MAP[players_results]
+            else:
+                outcome = _outcome(p1_result, p2_result)
+            if outcome:
+                self.result, winner = outcome
+                if winner == 1:
+                    self.winner = self.bot1
+                elif winner == 2:
+                    self.winner = self.bot2
+                elif winner == "Tie":
+                    self.winner = "Tie"
 
         if result.get("GameTime", None):
             self.game_time = result["GameTime"]
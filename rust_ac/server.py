@@ -1,8 +1,31 @@
 from . import PServer
+import asyncio
+import socket
+from atexit import register
 from multiprocessing import Process
+from typing import Dict, List, Optional, Set, Tuple
+
+import portpicker
+
 from .supervisor import Supervisor
 
 
+def _reserve_ports(count: int, host: str = '127.0.0.1') -> List[int]:
+    """
+    Picks count distinct free ports in one pass by binding them all at once, then releases them.
+    """
+    sockets = []
+    try:
+        for _ in range(count):
+            sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+            sockets.append(sock)
+            sock.bind((host, 0))
+        return [sock.getsockname()[1] for sock in sockets]
+    finally:
+        for sock in sockets:
+            sock.close()
+
+
 class Server:
     """
     Set up and run the Proxy server.
@@ -18,10 +41,84 @@ class Server:
         self.process.start()
 
     def kill(self):
-        self.process.kill()
+        self.process.terminate()
+
+    async def reset(self, timeout: float = 10):
+        """
+        Drops any game state left on the proxy so that it can host another game.
+        Raises ConnectionError if the proxy cannot be reached or does not confirm within timeout.
+        """
+        supervisor = await self.create_supervisor(timeout)
+        await supervisor.reset(timeout)
 
-    async def create_supervisor(self) -> Supervisor:
+    async def create_supervisor(self, timeout: float = 60) -> Supervisor:
         supervisor = Supervisor(self.ip_address)
-        await supervisor.connect()
+        await supervisor.connect(timeout)
         return supervisor
 
+
+class ServerPool:
+    """
+    Keeps a set of proxy servers running so that games do not pay the start-up cost.
+    """
+    def __init__(self, size: int, host: str = '127.0.0.1'):
+        self.size = size
+        self.host = host
+        self._servers: Dict[Server, int] = {}
+        self._picked_ports: Set[int] = set()  # Ports handed out by portpicker, which must be returned to it
+        self._idle: Optional[asyncio.Queue] = None
+        for port in _reserve_ports(size, host):
+            self._spawn(port)
+        register(self.kill)
+
+    def _spawn(self, port: int) -> Server:
+        server = Server(f"{self.host}:{port}")
+        server.run()
+        self._servers[server] = port
+        return server
+
+    @property
+    def _queue(self) -> asyncio.Queue:
+        # Created lazily so that the queue belongs to the loop running the games
+        if self._idle is None:
+            self._idle = asyncio.Queue()
+            for server in self._servers:
+                self._idle.put_nowait(server)
+        return self._idle
+
+    async def acquire(self) -> Tuple[Server, int]:
+        """
+        Returns an idle server and the port it listens on, starting an extra one if all are busy.
+        """
+        if self._queue.empty():
+            port = portpicker.pick_unused_port()
+            self._picked_ports.add(port)
+            server = self._spawn(port)
+        else:
+            server = self._queue.get_nowait()
+        return server, self._servers[server]
+
+    def _drop(self, server: Server):
+        server.kill()
+        port = self._servers.pop(server)
+        if port in self._picked_ports:
+            self._picked_ports.remove(port)
+            portpicker.return_port(port)
+
+    async def release(self, server: Server):
+        """
+        Resets the server and hands it back to the pool, or stops it if the pool is already full.
+        """
+        if len(self._servers) > self.size:
+            self._drop(server)
+            return
+        try:
+            await server.reset()
+        except ConnectionError:
+            self._drop(server)
+            return
+        self._queue.put_nowait(server)
+
+    def kill(self):
+        for server in self._servers:
+            server.kill()
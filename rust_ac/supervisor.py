@@ -1,11 +1,34 @@
 import asyncio
+import logging
+from atexit import register
 from .game_config import GameConfig
-from typing import Optional
+from typing import Dict, Optional
 
-from aiohttp import ClientSession, WSMsgType, ClientConnectorError
+from aiohttp import ClientSession, TCPConnector, WSMsgType, ClientError
 from .result import Result
 from datetime import datetime
 
+try:
+    from orjson import loads
+except ImportError:
+    from json import loads
+
+log = logging.getLogger(__name__)
+
+# One ClientSession per event loop, shared by every supervisor running on it
+# A plain dict: each session references its loop, so entries stay until close_session() or exit
+_SESSIONS: Dict[asyncio.AbstractEventLoop, ClientSession] = {}
+
+# The proxy does not act on "Received", so acks are only sent every ACK_INTERVAL frames
+ACK_INTERVAL = 16
+# Backoff bounds in seconds between attempts to reach a proxy that is still starting
+CONNECT_INITIAL_DELAY = 0.005
+CONNECT_MAX_DELAY = 0.5
+
+
+# Keys that carry state for Result.parse_result
+_VALID_KEYS = frozenset(('Result', 'GameTime', 'AverageFrameTime'))
+
 
 def valid_msg(msg):
     """
@@ -13,14 +36,38 @@ def valid_msg(msg):
     @param msg:
     @return:
     """
-    if 'Result' in msg:
-        return True
-    elif 'GameTime' in msg:
-        return True
-    elif 'AverageFrameTime' in msg:
-        return True
-    else:
-        return False
+    return not _VALID_KEYS.isdisjoint(msg)
+
+
+def _get_session() -> ClientSession:
+    """
+    Returns the session shared by supervisors on the running loop, creating it on first use.
+    """
+    loop = asyncio.get_event_loop()
+    session = _SESSIONS.get(loop)
+    if session is None or session.closed:
+        session = ClientSession(connector=TCPConnector(limit=0, ttl_dns_cache=300))
+        _SESSIONS[loop] = session
+    return session
+
+
+async def close_session():
+    """
+    Closes the session shared by supervisors on the running loop.
+    Code that drives Supervisor directly should await this before closing its event loop,
+    e.g. at the end of the coroutine passed to asyncio.run.
+    """
+    session = _SESSIONS.pop(asyncio.get_event_loop(), None)
+    if session is not None:
+        await session.close()
+
+
+@register
+def _close_sessions():
+    # Closes sessions left open on loops that are still usable at exit
+    for loop, session in list(_SESSIONS.items()):
+        if not session.closed and not loop.is_closed() and not loop.is_running():
+            loop.run_until_complete(session.close())
 
 
 def complete(msg):
@@ -34,32 +81,45 @@ class Supervisor:
     def __init__(self, ip_addr: str, config: Optional[GameConfig] = None):
         self.ip_address: str = ip_addr
         self._websocket = None
-        self._session = None
         if not config:
             self._config: GameConfig = GameConfig()
         else:
             self._config: GameConfig = config
 
-    async def connect(self):
+    async def connect(self, timeout: float = 60):
         """
-        Connects to address with headers
+        Connects to address with headers, retrying with exponential backoff until timeout
         """
-        ws, session = None, None
         headers = {"Supervisor": "true"}
         addr = self._parse_url()
-        for i in range(60):
-            await asyncio.sleep(1)
-            try:
-                session = ClientSession()
-                print(addr)
-                ws = await session.ws_connect(addr, headers=headers)
-                self._websocket = ws
-                self._session = session
+        host, port = self.ip_address.replace("/sc2api", "").rsplit(":", 1)
+        loop = asyncio.get_event_loop()
+        deadline = loop.time() + timeout
+        delay = CONNECT_INITIAL_DELAY
+        while True:
+            if await self._port_open(host, int(port)):  # Cheap check before the websocket upgrade
+                try:
+                    log.debug("Connecting to %s", addr)
+                    self._websocket = await _get_session().ws_connect(addr, headers=headers)
+                    return
+                except ClientError:
+                    log.debug("Could not connect to %s", addr)
+            if loop.time() + delay > deadline:
                 return
-            except ClientConnectorError:
-                await session.close()
-                if i > 15:
-                    return None, None
+            await asyncio.sleep(delay)
+            delay = min(delay * 1.5, CONNECT_MAX_DELAY)
+
+    @staticmethod
+    async def _port_open(host: str, port: int) -> bool:
+        """
+        Probes the proxy port with a plain TCP connection.
+        """
+        try:
+            _, writer = await asyncio.open_connection(host, port)
+        except OSError:
+            return False
+        writer.close()
+        return True
 
     def _parse_url(self) -> str:
         addr = self.ip_address.replace("/sc2api", "")
@@ -73,46 +133,60 @@ class Supervisor:
 
     async def wait_for_bot(self, timeout: int = 40) -> bool:
         try:
-            msg = await self._websocket.receive(timeout)
-            if msg.json().get("Bot", None) == "Connected":
-                return True
-            else:
-                await self._cleanup()
-                return False
+            msg = await asyncio.wait_for(self._websocket.receive(), timeout)
         except asyncio.TimeoutError:
             await self._cleanup()
             return False
+        if msg.type == WSMsgType.TEXT and loads(msg.data).get("Bot", None) == "Connected":
+            return True
+        await self._cleanup()
+        return False
 
     async def start_game(self):
         await self.connect()
-        if not self._websocket or not self._session:
+        if not self._websocket:
             raise ConnectionError("Please call .connect() before starting game")
 
-        msg = await self._websocket.receive()
+        # The proxy accepts the config as soon as the supervisor is registered, so the
+        # write is queued while waiting for its status message instead of after it
+        send_task = asyncio.ensure_future(self._send_config())
+        msg = None
+        try:
+            msg = await self._websocket.receive()
+        finally:
+            if msg is None or msg.type == WSMsgType.CLOSED:
+                # The write is abandoned, so a failed send must not hide why the receive ended
+                if not send_task.done():
+                    send_task.cancel()
+                elif not send_task.cancelled():
+                    send_task.exception()
         if msg.type == WSMsgType.CLOSED:
             raise ConnectionError("Server sent a CLOSED message")
+        await send_task
         if msg.json().get("Status") == "Connected":
-            print("Connected to proxy.")
-        await self._send_config()
+            log.info("Connected to proxy.")
 
         msg = await self._websocket.receive()
 
         if msg.type == WSMsgType.CLOSED:
             raise ConnectionError("Server sent a CLOSED message")
         if msg.json().get("Config") == "Received":
-            print("Config successfully sent. Bots can be started")
+            log.info("Config successfully sent. Bots can be started")
 
     async def _wait_for_result(self) -> Result:
         result = Result(self._config)
+        unacked = 0
         async for msg in self._websocket:
             if msg.type == WSMsgType.CLOSED:
                 if not result.has_result():
                     result.parse_result(error=True)
                     return result
-            msg = msg.json()
+            msg = loads(msg.data)
+            unacked += 1
 
-            if valid_msg(msg):
+            if not _VALID_KEYS.isdisjoint(msg):  # Inlined valid_msg, this runs for every frame
                 result.parse_result(msg)
+                unacked = ACK_INTERVAL  # Acknowledge consumed state straight away
 
             if 'Error' in msg:
                 if not result.has_result():
@@ -122,23 +196,38 @@ class Supervisor:
             if complete(msg):
                 result.parse_result({"TimeStamp": datetime.utcnow().strftime("%d-%m-%Y %H-%M-%SUTC")})
 
-            await self._websocket.send_str("Received")
+            if unacked >= ACK_INTERVAL:
+                await self._websocket.send_str("Received")
+                unacked = 0
         if not result.has_result():
             result.parse_result(error=True)
         return result
 
     async def _cleanup(self):
         await self._websocket.close()
-        await self._session.close()
 
     async def wait_for_result(self) -> Result:
         result = await self._wait_for_result()
         await self._cleanup()
         return result
 
-    async def reset(self):
+    async def reset(self, timeout: float = 10):
+        if not self._websocket:
+            raise ConnectionError("Please call .connect() before resetting")
         await self._websocket.send_str("Reset")
-        _ = await self._websocket.receive()  # Receive confirmation
+        try:
+            confirmed = await asyncio.wait_for(self._wait_for_reset(), timeout)
+        except asyncio.TimeoutError:
+            confirmed = False
+        await self._cleanup()  # The proxy drops the supervisor after a reset
+        if not confirmed:
+            raise ConnectionError("Proxy did not confirm the reset")
+
+    async def _wait_for_reset(self) -> bool:
+        async for msg in self._websocket:  # Skip anything sent before the confirmation
+            if msg.type == WSMsgType.TEXT and msg.data == "Reset":
+                return True
+        return False
 
 
 